@@ -4,12 +4,18 @@
 import os
 import sys
 import hashlib
+import mmap
+import shutil
 import urllib.request
+import urllib.error
 import json
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 import difflib
-from typing import Dict, List, Tuple
+from itertools import islice
+from collections import Counter
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
 import platform
 from datetime import datetime
 
@@ -33,19 +39,72 @@ except ImportError:
         BRIGHT = ''
         RESET_ALL = ''
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+
+# 下载和计算哈希时每次读取的块大小（1 MiB，是哈希分组大小的整数倍）
+CHUNK_SIZE = 1 << 20
+# 检测文件变化所用的哈希算法（仅用于判断内容是否相同，不用于安全校验）
+HASH_ALGO = "blake3" if HAS_BLAKE3 else "md5"
+# 同时下载的文件数上限（下载线程大部分时间在等待网络，可以远多于CPU核数）
+MAX_WORKERS = 32
+# 超过该大小且服务器支持Range时，分成 RANGE_PARTS 段并行下载
+RANGE_THRESHOLD = 32 << 20
+RANGE_PARTS = 8
+# 超过该大小的文件不生成差异预览
+DIFF_MAX_SIZE = 1 << 20
+# 差异最多保存的行数，以及其中显示的行数
+DIFF_MAX_LINES = 30
+DIFF_PREVIEW_LINES = 10
+# 差异行首字符对应的显示颜色
+DIFF_COLORS = {'+': Fore.GREEN, '-': Fore.RED, '@': Fore.MAGENTA}
+
+# 所有大文件的分段下载共用一个线程池，同时进行的分段请求最多 RANGE_PARTS 个，
+# 因此连接总数不超过 MAX_WORKERS + RANGE_PARTS
+_range_executor = ThreadPoolExecutor(max_workers=RANGE_PARTS)
+
+if HAS_REQUESTS:
+    # 所有下载线程共享一个会话，复用到同一主机的TCP/TLS连接
+    SESSION = requests.Session()
+    _adapter = HTTPAdapter(pool_connections=MAX_WORKERS,
+                           pool_maxsize=MAX_WORKERS + RANGE_PARTS)
+    SESSION.mount("http://", _adapter)
+    SESSION.mount("https://", _adapter)
+
+def load_json(file_path: str) -> Any:
+    """读取并解析JSON文件（安装了orjson时用它解析）"""
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    return orjson.loads(content) if HAS_ORJSON else json.loads(content)
+
 def load_config(config_file: str = "config.json") -> List[Dict]:
     """加载文件配置"""
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # 如果包含files键，返回files部分
-            if isinstance(data, dict) and "files" in data:
-                return data["files"]
-            # 如果是数组格式（旧格式），直接返回
-            elif isinstance(data, list):
-                return data
-            else:
-                raise ValueError("配置文件格式不正确")
+        data = load_json(config_file)
+        # 如果包含files键，返回files部分
+        if isinstance(data, dict) and "files" in data:
+            return data["files"]
+        # 如果是数组格式（旧格式），直接返回
+        elif isinstance(data, list):
+            return data
+        else:
+            raise ValueError("配置文件格式不正确")
     except FileNotFoundError:
         print_colored(f"配置文件 {config_file} 未找到，使用默认配置", Fore.YELLOW)
         default_files = [
@@ -83,8 +142,7 @@ def load_config(config_file: str = "config.json") -> List[Dict]:
 def load_sync_history(history_file: str = "sync_history.json") -> Dict:
     """加载同步历史记录"""
     try:
-        with open(history_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json(history_file)
     except FileNotFoundError:
         # 如果历史文件不存在，创建一个空的历史记录
         history = {"history": []}
@@ -95,10 +153,19 @@ def load_sync_history(history_file: str = "sync_history.json") -> Dict:
         return {"history": []}
 
 def save_sync_history(history: Dict, history_file: str = "sync_history.json") -> bool:
-    """保存同步历史记录"""
+    """保存同步历史记录
+
+    先写入临时文件再替换，程序中途退出时不会损坏已有的历史记录。
+    """
+    temp_file = history_file + ".tmp"
     try:
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+        if HAS_ORJSON:
+            content = orjson.dumps(history, option=orjson.OPT_INDENT_2)
+        else:
+            content = json.dumps(history, ensure_ascii=False, indent=2).encode('utf-8')
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+        os.replace(temp_file, history_file)
         return True
     except Exception as e:
         print_colored(f"保存历史记录失败: {str(e)}", Fore.RED)
@@ -118,87 +185,311 @@ def print_colored(text: str, color: str = '', style: str = '') -> None:
         else:
             print(text.encode('gbk', errors='ignore').decode('gbk'))
 
-def calculate_md5(file_path: str) -> str:
-    """计算文件的MD5值"""
-    hash_md5 = hashlib.md5()
+def create_hasher() -> Any:
+    """创建 HASH_ALGO 对应的哈希对象"""
+    return blake3.blake3() if HAS_BLAKE3 else hashlib.md5()
+
+def is_hash_cached(cache: Dict, stat: os.stat_result) -> bool:
+    """缓存条目中记录的哈希是否仍对应当前文件（大小和修改时间都未变）"""
+    return (
+        bool(cache.get("hash"))
+        and cache.get("algo") == HASH_ALGO
+        and cache.get("size") == stat.st_size
+        and cache.get("mtime_ns") == stat.st_mtime_ns
+    )
+
+def remember_hash(cache: Dict, stat: os.stat_result, file_hash: str) -> None:
+    """把文件的大小、修改时间和哈希记录到缓存条目中"""
+    cache["size"] = stat.st_size
+    cache["mtime_ns"] = stat.st_mtime_ns
+    cache["hash"] = file_hash
+    cache["algo"] = HASH_ALGO
+
+class HashingWriter:
+    """写入文件的同时更新哈希，配合 shutil.copyfileobj 在一次遍历中完成下载和哈希"""
+    
+    def __init__(self, file: BinaryIO, hasher: Any) -> None:
+        self.file = file
+        self.hasher = hasher
+        self.bytes_written = 0
+    
+    def write(self, data: bytes) -> int:
+        self.hasher.update(data)
+        self.bytes_written += len(data)
+        return self.file.write(data)
+
+def calculate_hash(file_path: str, cache: Optional[Dict] = None) -> str:
+    """计算文件的哈希值（算法见 HASH_ALGO）
+
+    传入 cache（同步历史中该文件的缓存条目）时，如果文件大小和修改时间与记录一致，
+    直接返回记录的哈希而不读取文件；否则重新计算并更新记录。
+    """
     try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        with open(file_path, "rb", buffering=0) as f:
+            stat = os.fstat(f.fileno())
+            if cache is not None and is_hash_cached(cache, stat):
+                return cache["hash"]
+            
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+：读取和哈希循环都在C中完成
+                file_hash = hashlib.file_digest(f, create_hasher).hexdigest()
+            else:
+                hasher = create_hasher()
+                if stat.st_size > 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        hasher.update(mm)
+                file_hash = hasher.hexdigest()
     except FileNotFoundError:
         return ""
+    
+    if cache is not None:
+        remember_hash(cache, stat, file_hash)
+    return file_hash
+
+
+
+# 本次运行中已确认存在的目录
+_created_dirs: Set[str] = set()
 
+def ensure_parent_dir(file_path: str) -> None:
+    """确保文件所在目录存在，同一目录在一次运行中只创建一次"""
+    directory = os.path.dirname(file_path)
+    if directory and directory not in _created_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _created_dirs.add(directory)
 
+def compare_files(old_file: str, new_file: str) -> List[str]:
+    """生成文件差异（调用方已通过哈希确认两个文件内容不同）
 
-def compare_files(old_file: str, new_content: bytes) -> Tuple[bool, List[str]]:
-    """比较文件差异"""
+    大文件和二进制文件不生成差异，返回空列表。
+    """
     try:
+        # 差异预览只对小文本文件有意义，大文件跳过读取和逐行比较
+        if max(os.path.getsize(old_file), os.path.getsize(new_file)) > DIFF_MAX_SIZE:
+            return []
+        
         with open(old_file, 'rb') as f:
             old_content = f.read()
+        with open(new_file, 'rb') as f:
+            new_content = f.read()
         
-        if old_content == new_content:
-            return False, []  # 没有变化
+        if b"\0" in old_content or b"\0" in new_content:
+            return []  # 二进制文件
         
         # 转换为字符串进行行比较
         old_lines = old_content.decode('utf-8', errors='ignore').splitlines(keepends=True)
         new_lines = new_content.decode('utf-8', errors='ignore').splitlines(keepends=True)
         
-        diff = list(difflib.unified_diff(
+        # unified_diff 是生成器，只取需要保存的前几行，不生成完整差异
+        base_name = os.path.basename(old_file)
+        diff = difflib.unified_diff(
             old_lines, 
             new_lines, 
-            fromfile=f'a/{os.path.basename(old_file)}',
-            tofile=f'b/{os.path.basename(old_file)}'
-        ))
+            fromfile=f'a/{base_name}',
+            tofile=f'b/{base_name}'
+        )
         
-        return True, diff  # 有变化
+        return list(islice(diff, DIFF_MAX_LINES))
     except FileNotFoundError:
-        return True, ["文件是新的"]  # 新文件
+        return ["文件是新的"]  # 新文件
     except Exception as e:
-        return False, [f"比较文件时出错: {str(e)}"]
+        return [f"比较文件时出错: {str(e)}"]
+
+@contextmanager
+def open_url(url: str, headers: Dict) -> Iterator[Tuple[int, Any, BinaryIO]]:
+    """发起GET请求，返回 (状态码, 响应头, 可读取的响应体)
+
+    安装了requests时使用共享会话以复用连接，否则回退到urllib。
+    状态码304不视为错误，其他错误状态抛出异常。
+    """
+    if HAS_REQUESTS:
+        with SESSION.get(url, headers=headers, stream=True) as response:
+            if response.status_code != 304:
+                response.raise_for_status()
+            response.raw.decode_content = True
+            yield response.status_code, response.headers, response.raw
+    else:
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request)
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            response = e
+        with response:
+            yield response.status, response.headers, response
+
+def download_ranges(url: str, file_path: str, size: int, validator: str) -> None:
+    """用多个HTTP Range请求并行下载大文件，各段直接写入预分配文件的对应位置
+
+    validator 为强验证器（强ETag或Last-Modified），作为 If-Range 发送，
+    保证各段来自同一版本的文件。
+    """
+    with open(file_path, 'wb') as f:
+        f.truncate(size)
+    
+    part_size = -(-size // RANGE_PARTS)
+    ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+    
+    def download_part(byte_range: Tuple[int, int]) -> None:
+        start, end = byte_range
+        # 文件在下载期间被修改时，服务器会返回完整内容而不是206
+        headers = {"Range": f"bytes={start}-{end}", "If-Range": validator}
+        with open_url(url, headers) as (status, response_headers, body), open(file_path, 'r+b') as f:
+            if status != 206:
+                raise ValueError(f"分段下载失败: 服务器返回 {status}")
+            content_range = response_headers.get("Content-Range")
+            if content_range != f"bytes {start}-{end}/{size}":
+                raise ValueError(f"分段下载失败: Content-Range 不匹配 ({content_range})")
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0 and (chunk := body.read(min(CHUNK_SIZE, remaining))):
+                f.write(chunk)
+                remaining -= len(chunk)
+            if remaining:
+                raise ValueError(f"分段下载不完整: 缺少 {remaining} 字节")
+    
+    # 提交到独立的共享线程池，避免占满主线程池后互相等待
+    futures = [_range_executor.submit(download_part, byte_range) for byte_range in ranges]
+    try:
+        for future in futures:
+            future.result()
+    finally:
+        # 某段失败时取消尚未开始的分段，并等待进行中的分段结束后再让调用方删除文件
+        for future in futures:
+            future.cancel()
+        wait(futures)
 
-def update_file(file_info: Dict) -> Dict:
-    """更新单个文件"""
-    name = file_info["name"]
-    url = file_info["url"]
-    local_path = file_info["local_path"]
+def apply_new_file(result: Dict, local_path: str, new_path: str, new_hash: str,
+                   cache: Dict, keep_source: bool = False) -> None:
+    """比较新文件与本地文件，有变化时记录差异并用新文件覆盖本地文件
+
+    keep_source 为 False 时直接移动 new_path（下载的临时文件），否则复制。
+    cache 中的哈希记录会同步更新。
+    """
+    result["algo"] = HASH_ALGO
+    
+    # 计算本地文件的哈希
+    local_hash = calculate_hash(local_path, cache)
+    
+    # 比较哈希
+    if local_hash == new_hash:
+        result["status"] = "unchanged"
+        result["message"] = "文件无变化"
+        return
+    
+    # 比较详细差异
+    result["diff"] = compare_files(local_path, new_path)
+    
+    algo = HASH_ALGO.upper()
+    if not local_hash:
+        result["status"] = "new"
+        result["message"] = f"新文件 ({algo}: {new_hash})"
+    else:
+        result["status"] = "updated"
+        result["message"] = f"文件已更新 (旧{algo}: {local_hash}, 新{algo}: {new_hash})"
     
+    # 用新文件替换旧文件
+    if keep_source:
+        ensure_parent_dir(local_path)
+        shutil.copyfile(new_path, local_path)
+    else:
+        os.replace(new_path, local_path)
+    remember_hash(cache, os.stat(local_path), new_hash)
+
+def update_file(file_info: Dict, file_cache: Dict) -> Dict:
+    """更新单个文件
+
+    file_cache 为同步历史中以本地路径为键的缓存表，其中该文件的条目保存上次响应的
+    ETag / Last-Modified 和本地文件的哈希记录，用于发起条件请求；
+    服务器返回304时无需下载内容，也无需计算本地文件哈希。
+    """
     result = {
-        "name": name,
+        "name": file_info.get("name", ""),
         "status": "unknown",
         "message": "",
         "diff": []
     }
     
+    # 配置项不完整时只让这一项失败，不影响其他文件
     try:
-        # 计算本地文件的MD5
-        local_md5 = calculate_md5(local_path)
-        
-        # 下载新文件内容到内存
-        with urllib.request.urlopen(url) as response:
-            new_content = response.read()
-            new_md5 = hashlib.md5(new_content).hexdigest()
-        
-        # 比较MD5
-        if local_md5 == new_md5:
-            result["status"] = "unchanged"
-            result["message"] = "文件无变化"
-        else:
-            # 比较详细差异
-            has_diff, diff_lines = compare_files(local_path, new_content)
-            result["diff"] = diff_lines
+        url = file_info["url"]
+        local_path = file_info["local_path"]
+    except KeyError as e:
+        result["status"] = "error"
+        result["message"] = f"配置缺少字段: {str(e)}"
+        return result
+    cache = file_cache.setdefault(local_path, {})
+    
+    # 只有URL未变、且本地文件自上次同步后未被改动时才发送条件请求头，
+    # 否则本地被修改或删除的文件会因为304而得不到恢复
+    headers = {}
+    try:
+        local_unchanged = is_hash_cached(cache, os.stat(local_path))
+    except FileNotFoundError:
+        local_unchanged = False
+    if cache.get("url") == url and local_unchanged:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+    
+    try:
+        # 边下载边计算哈希并写入临时文件，避免把整个文件读入内存
+        temp_path = local_path + ".part"
+        hasher = create_hasher()
+        try:
+            with open_url(url, headers) as (status, response_headers, body):
+                if status == 304:
+                    # 服务器确认文件未修改，直接跳过
+                    result["status"] = "unchanged"
+                    result["message"] = "文件无变化 (304)"
+                    return result
+                
+                ensure_parent_dir(local_path)
+                etag = response_headers.get("ETag")
+                last_modified = response_headers.get("Last-Modified")
+                size = int(response_headers.get("Content-Length") or 0)
+                # If-Range 要求强验证器，弱ETag时改用Last-Modified
+                validator = etag if etag and not etag.startswith("W/") else last_modified
+                # 大文件且服务器支持Range时改为分段并行下载，放弃当前响应；
+                # 没有强验证器时无法保证各段属于同一版本，仍然整体下载
+                use_ranges = (
+                    size > RANGE_THRESHOLD
+                    and response_headers.get("Accept-Ranges") == "bytes"
+                    and not response_headers.get("Content-Encoding")
+                    and validator is not None
+                )
+                if not use_ranges:
+                    with open(temp_path, 'wb') as f:
+                        writer = HashingWriter(f, hasher)
+                        shutil.copyfileobj(body, writer, CHUNK_SIZE)
+                    # 连接中途断开时 read() 只会提前返回空数据而不报错，
+                    # 必须核对长度，否则会用不完整的内容覆盖本地文件
+                    content_length = response_headers.get("Content-Length")
+                    if (content_length is not None
+                            and not response_headers.get("Content-Encoding")
+                            and writer.bytes_written != int(content_length)):
+                        raise ValueError(
+                            f"下载不完整: 收到 {writer.bytes_written} 字节，应为 {content_length} 字节")
             
-            if not local_md5:
-                result["status"] = "new"
-                result["message"] = f"新文件 (MD5: {new_md5})"
+            if use_ranges:
+                download_ranges(url, temp_path, size, validator)
+                new_hash = calculate_hash(temp_path)
             else:
-                result["status"] = "updated"
-                result["message"] = f"文件已更新 (旧MD5: {local_md5}, 新MD5: {new_md5})"
+                new_hash = hasher.hexdigest()
             
-            # 保存新文件
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-            with open(local_path, 'wb') as f:
-                f.write(new_content)
+            apply_new_file(result, local_path, temp_path, new_hash, cache)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        
+        # 记录响应的缓存验证头，供下次条件请求使用
+        cache["url"] = url
+        cache["etag"] = etag
+        cache["last_modified"] = last_modified
+        result["etag"] = etag
+        result["last_modified"] = last_modified
                 
     except Exception as e:
         result["status"] = "error"
@@ -206,6 +497,49 @@ def update_file(file_info: Dict) -> Dict:
     
     return result
 
+def sync_url_group(group: List[Dict], file_cache: Dict) -> List[Dict]:
+    """同步指向同一URL的一组文件：只下载一次，再复制到其余本地路径"""
+    primary = group[0]
+    primary_result = update_file(primary, file_cache)
+    results = [primary_result]
+    if len(group) == 1:
+        return results
+    
+    # 以下任何异常都只记为对应条目的错误，不能丢失已经写入文件的主条目结果
+    source_hash = None
+    source_error = primary_result["message"]
+    if primary_result["status"] != "error":
+        try:
+            source_hash = calculate_hash(primary["local_path"], file_cache[primary["local_path"]])
+        except Exception as e:
+            source_error = f"读取已下载文件失败: {str(e)}"
+    
+    for file_info in group[1:]:
+        result = {
+            "name": file_info.get("name", ""),
+            "status": "unknown",
+            "message": "",
+            "diff": []
+        }
+        if source_hash is None:
+            result["status"] = "error"
+            result["message"] = source_error
+        else:
+            try:
+                local_path = file_info["local_path"]
+                cache = file_cache.setdefault(local_path, {})
+                apply_new_file(result, local_path, primary["local_path"],
+                               source_hash, cache, keep_source=True)
+            except KeyError as e:
+                result["status"] = "error"
+                result["message"] = f"配置缺少字段: {str(e)}"
+            except Exception as e:
+                result["status"] = "error"
+                result["message"] = f"更新失败: {str(e)}"
+        results.append(result)
+    
+    return results
+
 def print_update_result(result: Dict) -> None:
     """打印更新结果"""
     name = result["name"]
@@ -221,17 +555,18 @@ def print_update_result(result: Dict) -> None:
         # 显示差异（如果有）
         if result["diff"]:
             print("  差异预览:")
-            for line in result["diff"][:10]:  # 只显示前10行
-                if line.startswith('+'):
-                    print_colored(f"    {line.rstrip()}", Fore.GREEN)
-                elif line.startswith('-'):
-                    print_colored(f"    {line.rstrip()}", Fore.RED)
-                elif line.startswith('@'):
-                    print_colored(f"    {line.rstrip()}", Fore.MAGENTA)
+            for line in result["diff"][:DIFF_PREVIEW_LINES]:
+                color = DIFF_COLORS.get(line[:1])
+                if color:
+                    print_colored(f"    {line.rstrip()}", color)
                 else:
                     print(f"    {line.rstrip()}")
-            if len(result["diff"]) > 10:
-                print_colored(f"    ... 还有{len(result["diff"]) - 10}行差异", Fore.CYAN)
+            remaining = len(result["diff"]) - DIFF_PREVIEW_LINES
+            if len(result["diff"]) >= DIFF_MAX_LINES:
+                # 只保存了前 DIFF_MAX_LINES 行，实际差异可能更多
+                print_colored(f"    ... 至少还有{remaining}行差异", Fore.CYAN)
+            elif remaining > 0:
+                print_colored(f"    ... 还有{remaining}行差异", Fore.CYAN)
     elif status == "error":
         print_colored(f"✗ {name}: {message}", Fore.RED)
 
@@ -249,6 +584,8 @@ def main() -> None:
     
     # 从独立的历史文件加载同步历史
     sync_data = load_sync_history("sync_history.json")
+    # 每个本地文件的缓存信息（ETag / Last-Modified、哈希记录），以本地路径为键
+    file_cache = sync_data.setdefault("files", {})
     
     # 显示上次同步时间
     if sync_data["history"]:
@@ -266,30 +603,48 @@ def main() -> None:
         "files": []
     }
     
+    # 相同URL的文件只下载一次；缺少url或local_path的配置项单独成组，
+    # 由 update_file 报告错误，不影响同一URL的其他条目
+    groups: List[List[Dict]] = []
+    url_groups: Dict[str, List[Dict]] = {}
+    for file_info in files_config:
+        url = file_info.get("url")
+        if url is None or "local_path" not in file_info:
+            groups.append([file_info])
+        else:
+            url_groups.setdefault(url, []).append(file_info)
+    groups.extend(url_groups.values())
+    
     # 使用线程池下载所有文件
-    with ThreadPoolExecutor(max_workers=5) as executor:
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(groups))) as executor:
         # 提交所有下载任务
-        future_to_file = {
-            executor.submit(update_file, file_info): file_info 
-            for file_info in files_config
+        future_to_group = {
+            executor.submit(sync_url_group, group, file_cache): group 
+            for group in groups
         }
         
         # 处理完成的任务
-        for future in as_completed(future_to_file):
-            file_info = future_to_file[future]
+        for future in as_completed(future_to_group):
+            group = future_to_group[future]
             try:
-                result = future.result()
-                print_update_result(result)
-                # 添加到同步记录
-                sync_record["files"].append(result)
+                for result in future.result():
+                    print_update_result(result)
+                    # 添加到同步记录
+                    sync_record["files"].append(result)
             except Exception as e:
-                print_colored(f"✗ {file_info['name']}: 处理时发生异常: {str(e)}", Fore.RED)
+                for file_info in group:
+                    print_colored(f"✗ {file_info.get('name', '')}: 处理时发生异常: {str(e)}", Fore.RED)
     
     # 将同步记录添加到历史中
     sync_data["history"].append(sync_record)
     # 只保留最近10次记录
     if len(sync_data["history"]) > 10:
         sync_data["history"] = sync_data["history"][-10:]
+    # 删除已从配置中移除的本地路径的缓存记录
+    current_paths = {file_info.get("local_path") for file_info in files_config}
+    sync_data["files"] = {
+        path: entry for path, entry in file_cache.items() if path in current_paths
+    }
     
     # 保存同步记录到独立的历史文件
     save_sync_history(sync_data, "sync_history.json")
@@ -303,10 +658,7 @@ def main() -> None:
     # 显示历史记录摘要
     print("\n最近同步记录:")
     for i, record in enumerate(sync_data["history"][-5:]):  # 显示最近5次
-        status_counts = {"unchanged": 0, "new": 0, "updated": 0, "error": 0}
-        for file in record["files"]:
-            status_counts[file["status"]] += 1
-        
+        status_counts = Counter(file["status"] for file in record["files"])
         print(f"  {record['timestamp'][:19]} - 新增:{status_counts['new']} 更新:{status_counts['updated']} 无变化:{status_counts['unchanged']} 错误:{status_counts['error']}")
 
 def wait_for_exit() -> None: